@@ -0,0 +1,206 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+ALERT_COLUMNS = ['id', 'disease', 'location', 'alert_level', 'description_en', 'description_hi',
+                 'date_created', 'valid_from', 'expires_at']
+
+
+def to_local_time(moment):
+    """Naive local time for a datetime, so it compares with the naive ISO strings in the database"""
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def format_sse(alert, event_id=None):
+    """Format an alert dict as a Server-Sent Events message"""
+    event_id = alert['id'] if event_id is None else event_id
+    return f"id: {event_id}\nevent: alert\ndata: {json.dumps(alert, ensure_ascii=False)}\n\n"
+
+
+class Subscriber:
+    """One connected client with a bounded queue of pending alerts"""
+
+    def __init__(self, locations, max_pending):
+        self.locations = locations
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def wants(self, alert):
+        return not self.locations or alert['location'].lower() in self.locations
+
+    def offer(self, alert):
+        """Queue an alert without blocking; a full queue marks the client as overflowed"""
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            self.overflowed = True
+
+
+class AlertBroker:
+    """Fans out new outbreak_alerts rows to subscribers from one watcher thread"""
+
+    def __init__(self, db_path='health_data.db', poll_interval=5.0, max_subscribers=5000, max_pending=20,
+                 start=True):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.last_id = self.get_max_id()
+        # valid_from of alerts already inserted that have not started yet, by id
+        self.scheduled = {alert['id']: alert['valid_from'] for alert in self.fetch_scheduled()}
+        self.watcher = None
+        if start:
+            self.start()
+
+    def start(self):
+        """Start the watcher thread"""
+        self.watcher = threading.Thread(target=self.run_watcher, name='alert-watcher', daemon=True)
+        self.watcher.start()
+
+    def get_max_id(self):
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM outbreak_alerts')
+        max_id = cursor.fetchone()[0]
+        conn.close()
+        return max_id
+
+    def fetch_since(self, last_id, limit=100, include_scheduled=False):
+        """Unexpired alerts after last_id; ones that have not started yet only if include_scheduled"""
+        now = datetime.now().isoformat(timespec='seconds')
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {', '.join(ALERT_COLUMNS)} FROM outbreak_alerts
+            WHERE id > ? AND expires_at > ? AND (valid_from <= ? OR ?) ORDER BY id LIMIT ?
+        ''', (last_id, now, now, include_scheduled, limit))
+        alerts = [dict(zip(ALERT_COLUMNS, row)) for row in cursor.fetchall()]
+        conn.close()
+        return alerts
+
+    def fetch_scheduled(self, ids=None):
+        """Unexpired alerts that have not started yet, or just those among ids that have"""
+        now = datetime.now().isoformat(timespec='seconds')
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        if ids is None:
+            condition, params = 'valid_from > ?', (now,)
+        else:
+            condition, params = f"id IN ({', '.join('?' * len(ids))}) AND valid_from <= ?", tuple(ids) + (now,)
+        cursor.execute(f'''
+            SELECT {', '.join(ALERT_COLUMNS)} FROM outbreak_alerts
+            WHERE {condition} AND expires_at > ? ORDER BY id
+        ''', params + (now,))
+        alerts = [dict(zip(ALERT_COLUMNS, row)) for row in cursor.fetchall()]
+        conn.close()
+        return alerts
+
+    def subscribe(self, locations=None):
+        """Register a client; returns None when the subscriber limit is reached"""
+        subscriber = Subscriber({location.strip().lower() for location in locations or [] if location.strip()},
+                                self.max_pending)
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                return None
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def notify(self):
+        """Signal that outbreak_alerts changed so the watcher checks right away"""
+        self.changed.set()
+
+    def publish(self, alert):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            if subscriber.wants(alert):
+                subscriber.offer(alert)
+
+    def next_wait(self):
+        """Seconds until the next poll, or sooner if a scheduled alert starts first"""
+        if not self.scheduled:
+            return self.poll_interval
+        starts = to_local_time(datetime.fromisoformat(min(self.scheduled.values())))
+        return max(0.0, min(self.poll_interval, (starts - datetime.now()).total_seconds()))
+
+    def run_watcher(self):
+        while True:
+            try:
+                timeout = self.next_wait()
+            except (TypeError, ValueError) as e:
+                logger.error("Alert watcher schedule error: %s", e)
+                timeout = self.poll_interval
+            self.changed.wait(timeout)
+            self.changed.clear()
+            now = datetime.now().isoformat(timespec='seconds')
+            try:
+                alerts = self.fetch_since(self.last_id, include_scheduled=True)
+                # Re-read started alerts so superseded or archived ones are not sent
+                started = [alert_id for alert_id, valid_from in self.scheduled.items() if valid_from <= now]
+                if started:
+                    alerts += self.fetch_scheduled(started)
+            except sqlite3.Error as e:
+                logger.error("Alert watcher error: %s", e)
+                continue
+            for alert_id in started:
+                del self.scheduled[alert_id]
+            for alert in alerts:
+                self.last_id = max(self.last_id, alert['id'])
+                if alert['valid_from'] > now:
+                    self.scheduled[alert['id']] = alert['valid_from']
+                else:
+                    self.publish(alert)
+
+    def stream(self, subscriber, last_event_id=None, heartbeat=15.0):
+        """Yield SSE messages for a subscriber until it disconnects or overflows"""
+        try:
+            yield "retry: 3000\n\n"
+            # Scheduled alerts are published when they start, possibly after
+            # alerts with higher ids. The event id stays at the highest id
+            # sent, so Last-Event-ID never makes a reconnect replay old alerts.
+            sent_id = last_event_id or 0
+            replayed = set()
+            if last_event_id is not None:
+                for alert in self.fetch_since(last_event_id):
+                    sent_id = alert['id']
+                    replayed.add(alert['id'])
+                    if subscriber.wants(alert):
+                        yield format_sse(alert)
+
+            while not subscriber.overflowed:
+                try:
+                    alert = subscriber.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                # Skip alerts that were already sent while replaying
+                if alert['id'] not in replayed:
+                    sent_id = max(sent_id, alert['id'])
+                    yield format_sse(alert, sent_id)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def get_stats(self):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        return {
+            'subscribers': len(subscribers),
+            'max_subscribers': self.max_subscribers,
+            'pending': sum(subscriber.queue.qsize() for subscriber in subscribers),
+            'last_id': self.last_id,
+            'scheduled': len(self.scheduled)
+        }
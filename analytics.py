@@ -0,0 +1,241 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsStore:
+    """Append-only log of chat requests with hourly rollups, written behind a bounded queue"""
+
+    def __init__(self, db_path='analytics.db', max_queue=10000, batch_size=500,
+                 flush_interval=1.0, retention_days=30, compact_interval=3600, start=True):
+        self.db_path = db_path
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.compact_interval = compact_interval
+        self.dropped = 0
+        self.written = 0
+        self.init_database()
+        self.stop_event = threading.Event()
+        self.writer = None
+        if start:
+            self.start()
+
+    def start(self):
+        """Start the background writer"""
+        self.writer = threading.Thread(target=self.run_writer, name='analytics-writer', daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def init_database(self):
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS chat_events (
+                id INTEGER PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                language TEXT NOT NULL,
+                location TEXT NOT NULL,
+                latency_ms REAL NOT NULL,
+                message TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_events_created_at ON chat_events (created_at)')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS chat_rollups (
+                hour TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                language TEXT NOT NULL,
+                location TEXT NOT NULL,
+                requests INTEGER NOT NULL,
+                total_latency_ms REAL NOT NULL,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (hour, intent, language, location)
+            )
+        ''')
+
+        # Token columns were added after the first release of this store
+        for table in ('chat_events', 'chat_rollups'):
+            cursor.execute(f'PRAGMA table_info({table})')
+            columns = [column[1] for column in cursor.fetchall()]
+            for column in ('prompt_tokens', 'completion_tokens'):
+                if column not in columns:
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0')
+
+        conn.commit()
+        conn.close()
+
+    def record(self, intent, language, location='', latency_ms=0.0, message='',
+               prompt_tokens=0, completion_tokens=0):
+        """Queue one chat event without blocking; returns False if dropped"""
+        event = (
+            datetime.now().isoformat(timespec='seconds'),
+            intent,
+            language,
+            (location or '').strip().title(),
+            round(latency_ms, 2),
+            message[:500].strip().lower(),
+            prompt_tokens or 0,
+            completion_tokens or 0
+        )
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def run_writer(self):
+        conn = self.connect()
+        next_compaction = time.monotonic() + self.compact_interval
+        while not self.stop_event.is_set() or not self.queue.empty():
+            batch = self.drain(self.flush_interval)
+            if batch:
+                try:
+                    self.write_batch(conn, batch)
+                except sqlite3.Error as e:
+                    logger.error("Analytics write error: %s", e, extra={'events_lost': len(batch)})
+            if time.monotonic() >= next_compaction:
+                self.compact(conn)
+                next_compaction = time.monotonic() + self.compact_interval
+        conn.close()
+
+    def drain(self, timeout):
+        """Collect up to batch_size events, waiting at most timeout for the first"""
+        try:
+            batch = [self.queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def write_batch(self, conn, batch):
+        requests = Counter()
+        latency = Counter()
+        prompt = Counter()
+        completion = Counter()
+        for created_at, intent, language, location, latency_ms, _, prompt_tokens, completion_tokens in batch:
+            key = (created_at[:13] + ':00', intent, language, location)
+            requests[key] += 1
+            latency[key] += latency_ms
+            prompt[key] += prompt_tokens
+            completion[key] += completion_tokens
+
+        with conn:
+            conn.executemany('''
+                INSERT INTO chat_events
+                (created_at, intent, language, location, latency_ms, message, prompt_tokens, completion_tokens)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', batch)
+            conn.executemany('''
+                INSERT INTO chat_rollups
+                (hour, intent, language, location, requests, total_latency_ms, prompt_tokens, completion_tokens)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (hour, intent, language, location) DO UPDATE SET
+                    requests = requests + excluded.requests,
+                    total_latency_ms = total_latency_ms + excluded.total_latency_ms,
+                    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                    completion_tokens = completion_tokens + excluded.completion_tokens
+            ''', [key + (count, latency[key], prompt[key], completion[key]) for key, count in requests.items()])
+        self.written += len(batch)
+
+    def compact(self, conn, batch_size=5000):
+        """Delete raw events past the retention window in small batches, keeping rollups"""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat(timespec='seconds')
+        deleted = 0
+        try:
+            while True:
+                with conn:
+                    cursor = conn.execute('''
+                        DELETE FROM chat_events WHERE id IN (
+                            SELECT id FROM chat_events WHERE created_at < ? LIMIT ?
+                        )
+                    ''', (cutoff, batch_size))
+                deleted += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    break
+            if deleted:
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        except sqlite3.Error as e:
+            logger.error("Analytics compaction error: %s", e)
+        return deleted
+
+    def get_stats(self, hours=24, top=10):
+        """Aggregate rollups (and top raw questions) for the last N hours"""
+        since = (datetime.now() - timedelta(hours=hours)).isoformat(timespec='seconds')[:13] + ':00'
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        def grouped(column):
+            cursor.execute(f'''
+                SELECT {column}, SUM(requests), SUM(total_latency_ms) / SUM(requests),
+                       SUM(prompt_tokens), SUM(completion_tokens)
+                FROM chat_rollups WHERE hour >= ?
+                GROUP BY {column} ORDER BY SUM(requests) DESC
+            ''', (since,))
+            return [
+                {
+                    column: value,
+                    'requests': requests,
+                    'avg_latency_ms': round(avg_latency, 2),
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'avg_completion_tokens': round(completion_tokens / requests, 1)
+                }
+                for value, requests, avg_latency, prompt_tokens, completion_tokens in cursor.fetchall()
+            ]
+
+        stats = {
+            'since': since,
+            'by_intent': grouped('intent'),
+            'by_language': grouped('language'),
+            'by_location': grouped('location'),
+            'by_hour': grouped('hour')
+        }
+
+        cursor.execute('''
+            SELECT message, intent, COUNT(*) FROM chat_events
+            WHERE created_at >= ?
+            GROUP BY message, intent ORDER BY COUNT(*) DESC LIMIT ?
+        ''', (since, top))
+        stats['top_questions'] = [
+            {'message': message, 'intent': intent, 'requests': count}
+            for message, intent, count in cursor.fetchall()
+        ]
+        conn.close()
+
+        stats['total_requests'] = sum(row['requests'] for row in stats['by_intent'])
+        stats['total_prompt_tokens'] = sum(row['prompt_tokens'] for row in stats['by_intent'])
+        stats['total_completion_tokens'] = sum(row['completion_tokens'] for row in stats['by_intent'])
+        stats['queue'] = {
+            'pending': self.queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped
+        }
+        return stats
+
+    def close(self, timeout=5):
+        """Flush queued events and stop the writer thread"""
+        self.stop_event.set()
+        if self.writer is not None:
+            self.writer.join(timeout)
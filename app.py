@@ -1,31 +1,181 @@
 import os
+import re
 import json
+import time
+import atexit
+import logging
+import uuid
+import functools
+import threading
 import sqlite3
-from datetime import datetime
-from flask import Flask, request, jsonify, render_template
+from datetime import datetime, date, timedelta
+from types import MappingProxyType
+from flask import (Flask, request, jsonify, render_template, Response, stream_with_context,
+                   after_this_request, g, has_request_context)
 from flask_cors import CORS
 from langdetect import detect
 from langdetect.lang_detect_exception import LangDetectException
-from openai import OpenAI
-
-# Using a stable OpenAI model that works with the current SDK version
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+from alert_stream import AlertBroker, to_local_time
+from analytics import AnalyticsStore
+from llm_router import LLMRouter
+from profiling import RequestProfiler
+from reference_data import ReferenceSnapshot, SnapshotWatcher
+from structured_log import setup_logging
+from translation_memory import TranslationMemory, REGIONAL_LANGUAGES, source_hash
+from token_budget import (TokenCounter, get_output_budget, CHANNEL_OUTPUT_LIMITS, DEFAULT_CHANNEL,
+                          PROMPT_TOKEN_LIMIT)
+from immunization import (DoseTable, DEFAULT_HORIZON_DAYS, fetch_schedule_rows, parse_birth_date,
+                          read_roster_csv, write_due_csv)
+
+def get_log_context():
+    """Fields added to every log record written while handling a request"""
+    if has_request_context() and 'request_id' in g:
+        return {'request_id': g.request_id}
+    return {}
+
+# JSON log lines are queued and written by a background thread, so a slow
+# log pipe never blocks request handling
+structured_logging = setup_logging(context=get_log_context)
+atexit.register(structured_logging.stop)
+logger = logging.getLogger(__name__)
+
+# OpenAI-compatible backends (OpenAI gpt-4o-mini unless LLM_BACKENDS is set),
+# routed by observed latency and error rate
+llm_router = LLMRouter.from_env()
+token_counter = TokenCounter()
+
+def translate_text(text, language):
+    """Translate English health content into a regional language with the LLM"""
+    response, _ = llm_router.complete(
+        messages=[
+            {"role": "system", "content": f"Translate the user's health information from English into "
+                                          f"{REGIONAL_LANGUAGES[language]}. Keep line breaks, bullets, emoji, "
+                                          f"numbers, dates and vaccine or medicine names as they are. "
+                                          f"Reply with the translation only."},
+            {"role": "user", "content": text}
+        ],
+        max_tokens=min(token_counter.count(text) * 4, 4096),
+        temperature=0
+    )
+    return response.choices[0].message.content
+
+# Languages /chat answers in; regional ones are served from translations
+SUPPORTED_LANGUAGES = ('en', 'hi') + tuple(REGIONAL_LANGUAGES)
+
+# A regional-language LLM answer is stored once its question was asked this often
+TRANSLATION_MEMORY_MIN_REPEATS = int(os.environ.get("TRANSLATION_MEMORY_MIN_REPEATS", "2"))
+
+# Alerts without an explicit expiry stay active for this many days
+ALERT_VALIDITY_DAYS = 30
+
+# How often expired alerts are moved to the archive table
+ALERT_ARCHIVE_INTERVAL_SECONDS = 3600
+
+OUTBREAK_ALERTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        disease TEXT NOT NULL,
+        location TEXT NOT NULL,
+        alert_level TEXT NOT NULL,
+        description_en TEXT NOT NULL,
+        description_hi TEXT NOT NULL,
+        date_created TEXT NOT NULL,
+        valid_from TEXT NOT NULL,
+        expires_at TEXT NOT NULL,
+        UNIQUE(disease, location)
+    )
+'''
+
+# Admin-only endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Set by serve.py: the app is imported by a pre-fork master and background
+# threads must only be started in the processes that use them
+PREFORK = os.environ.get("HEALTH_MITRA_PREFORK") == "1"
+
+# Percentage of profiled-endpoint traffic to stack-sample (0 disables sampling)
+PROFILE_SAMPLE_PERCENT = float(os.environ.get("PROFILE_SAMPLE_PERCENT", "0"))
 
 app = Flask(__name__)
 CORS(app)
 
+@app.before_request
+def assign_request_id():
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
 # Cache control for Replit environment
 @app.after_request
 def after_request(response):
     response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
     response.headers["Pragma"] = "no-cache"
     response.headers["Expires"] = "0"
+    if 'request_id' in g:
+        response.headers["X-Request-ID"] = g.request_id
     return response
 
 class HealthChatbot:
+    # Keyword routing for intents, checked in order; the first match wins
+    INTENT_KEYWORDS = [
+        ('vaccination', ['vaccination', 'vaccine', 'टीका', 'टीकाकरण', 'immunization', 'प्रतिरक्षण']),
+        ('outbreak', ['outbreak', 'alert', 'epidemic', 'प्रकोप', 'अलर्ट', 'pandemic', 'महामारी', 'current', 'latest', 'news', 'समाचार']),
+        ('covid', ['covid', 'coronavirus', 'corona', 'कोरोना', 'कोविड']),
+        ('fever', ['fever', 'बुखार', 'temperature', 'तापमान', 'hot', 'गर्म']),
+        ('diabetes', ['diabetes', 'डायबिटीज', 'मधुमेह', 'sugar', 'blood sugar', 'insulin', 'इंसुलिन']),
+        ('pregnancy', ['pregnancy', 'pregnant', 'गर्भावस्था', 'गर्भवती', 'prenatal', 'maternal', 'baby', 'बच्चा']),
+        ('hypertension', ['pressure', 'hypertension', 'bp', 'blood pressure', 'हाई ब्लड प्रेशर', 'उच्च रक्तचाप']),
+        ('mental_health', ['depression', 'anxiety', 'stress', 'mental health', 'अवसाद', 'चिंता', 'तनाव', 'मानसिक स्वास्थ्य']),
+        ('first_aid', ['first aid', 'emergency', 'accident', 'injury', 'प्राथमिक चिकित्सा', 'आपातकाल', 'दुर्घटना', 'चोट']),
+        ('child_health', ['child', 'baby', 'infant', 'बच्चा', 'शिशु', 'pediatric', 'children']),
+        ('common_symptoms', ['headache', 'cough', 'cold', 'stomach pain', 'सिरदर्द', 'खांसी', 'सर्दी', 'पेट दर्द']),
+        ('nutrition', ['nutrition', 'diet', 'food', 'healthy eating', 'पोषण', 'आहार', 'भोजन', 'खाना']),
+        ('elderly_care', ['elderly', 'old age', 'senior', 'बुजुर्ग', 'बूढ़े', 'वृद्ध']),
+    ]
+    
     def __init__(self):
         self.init_database()
+        self.snapshot = None
+        self.refresh_snapshot()
+    
+    @property
+    def dose_table(self):
+        return self.snapshot.dose_table
+    
+    def build_snapshot(self):
+        """Read all reference data into a new immutable ReferenceSnapshot"""
+        now = datetime.now().isoformat(timespec='seconds')
+        conn = sqlite3.connect('health_data.db')
+        cursor = conn.cursor()
+        # The snapshot's alert list is stale at the next expiry or start time
+        cursor.execute('''
+            SELECT MIN(moment) FROM (
+                SELECT MIN(expires_at) AS moment FROM outbreak_alerts WHERE expires_at > ?
+                UNION ALL
+                SELECT MIN(valid_from) FROM outbreak_alerts WHERE valid_from > ?
+            )
+        ''', (now, now))
+        valid_until = cursor.fetchone()[0]
+        conn.close()
+        
+        languages = ('en', 'hi')
+        intents = [intent for intent, _ in self.INTENT_KEYWORDS if intent not in ('vaccination', 'outbreak')]
+        return ReferenceSnapshot(
+            built_at=now,
+            vaccination_info=MappingProxyType({language: self.load_vaccination_info(language) for language in languages}),
+            outbreak_info=MappingProxyType({language: self.load_outbreak_alerts(language) for language in languages}),
+            valid_until=valid_until,
+            dose_table=DoseTable.from_db(),
+            fallback_catalog=MappingProxyType({
+                (intent, language): self.render_catalog_response(intent, language)
+                for intent in intents + ['general'] for language in languages
+            }),
+            intent_keywords=tuple((intent, tuple(keywords)) for intent, keywords in self.INTENT_KEYWORDS)
+        )
+    
+    def refresh_snapshot(self):
+        """Build a new snapshot and swap it in with a single assignment"""
+        snapshot = self.build_snapshot()
+        self.snapshot = snapshot
+        return snapshot
         
     def init_database(self):
         """Initialize SQLite database with vaccination schedules and health data"""
@@ -44,19 +194,28 @@ class HealthChatbot:
             )
         ''')
         
-        # Create outbreak alerts table
+        # Create outbreak alerts table (only active alerts live here)
+        cursor.execute(OUTBREAK_ALERTS_SCHEMA.format(table='outbreak_alerts'))
+        
+        # Expired and superseded alerts are moved here by archive_expired_alerts
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS outbreak_alerts (
+            CREATE TABLE IF NOT EXISTS outbreak_alerts_archive (
                 id INTEGER PRIMARY KEY,
+                alert_id INTEGER NOT NULL,
                 disease TEXT NOT NULL,
                 location TEXT NOT NULL,
                 alert_level TEXT NOT NULL,
                 description_en TEXT NOT NULL,
                 description_hi TEXT NOT NULL,
                 date_created TEXT NOT NULL,
-                UNIQUE(disease, location)
+                valid_from TEXT NOT NULL,
+                expires_at TEXT NOT NULL,
+                archived_at TEXT NOT NULL
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbreak_alerts_archive_location ON outbreak_alerts_archive (disease, location)')
+        self.migrate_outbreak_alerts(cursor)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_outbreak_alerts_expires_at ON outbreak_alerts (expires_at)')
         
         # Insert vaccination data
         vaccinations = [
@@ -74,30 +233,102 @@ class HealthChatbot:
             VALUES (?, ?, ?, ?, ?)
         ''', vaccinations)
         
-        # Insert mock outbreak alerts
+        # Insert mock outbreak alerts once; an alert that was seeded before
+        # (even if it has since expired and been archived) is left alone so
+        # restarts do not make stale alerts look fresh again
+        now = datetime.now()
+        valid_from = now.isoformat(timespec='seconds')
+        expires_at = (now + timedelta(days=ALERT_VALIDITY_DAYS)).isoformat(timespec='seconds')
         alerts = [
-            ("Dengue", "Delhi", "Medium", "Increased dengue cases reported. Use mosquito nets and avoid water stagnation.", "डेंगू के मामले बढ़े हैं। मच्छरदानी का उपयोग करें और पानी जमने न दें।", datetime.now().isoformat()),
-            ("Malaria", "Mumbai", "High", "High malaria cases in monsoon season. Take preventive measures.", "मानसून में मलेरिया के अधिक मामले। बचाव के उपाय करें।", datetime.now().isoformat())
+            ("Dengue", "Delhi", "Medium", "Increased dengue cases reported. Use mosquito nets and avoid water stagnation.", "डेंगू के मामले बढ़े हैं। मच्छरदानी का उपयोग करें और पानी जमने न दें।"),
+            ("Malaria", "Mumbai", "High", "High malaria cases in monsoon season. Take preventive measures.", "मानसून में मलेरिया के अधिक मामले। बचाव के उपाय करें।")
         ]
         
         cursor.executemany('''
-            INSERT OR REPLACE INTO outbreak_alerts 
-            (disease, location, alert_level, description_en, description_hi, date_created)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', alerts)
+            INSERT INTO outbreak_alerts 
+            (disease, location, alert_level, description_en, description_hi, date_created, valid_from, expires_at)
+            SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?6, ?7
+            WHERE NOT EXISTS (SELECT 1 FROM outbreak_alerts WHERE disease = ?1 AND location = ?2)
+            AND NOT EXISTS (SELECT 1 FROM outbreak_alerts_archive WHERE disease = ?1 AND location = ?2)
+        ''', [alert + (valid_from, expires_at) for alert in alerts])
         
         conn.commit()
         conn.close()
     
+    def migrate_outbreak_alerts(self, cursor):
+        """Rebuild a pre-validity-window outbreak_alerts table, archiving duplicate rows"""
+        cursor.execute('PRAGMA table_info(outbreak_alerts)')
+        if 'expires_at' in [column[1] for column in cursor.fetchall()]:
+            return
+        
+        archived_at = datetime.now().isoformat(timespec='seconds')
+        validity = f'+{ALERT_VALIDITY_DAYS} days'
+        cursor.execute(OUTBREAK_ALERTS_SCHEMA.format(table='outbreak_alerts_migrated'))
+        cursor.execute('''
+            INSERT INTO outbreak_alerts_archive
+            (alert_id, disease, location, alert_level, description_en, description_hi,
+             date_created, valid_from, expires_at, archived_at)
+            SELECT id, disease, location, alert_level, description_en, description_hi, date_created,
+                   strftime('%Y-%m-%dT%H:%M:%S', date_created),
+                   strftime('%Y-%m-%dT%H:%M:%S', date_created, ?), ?
+            FROM outbreak_alerts
+            WHERE id NOT IN (SELECT MAX(id) FROM outbreak_alerts GROUP BY disease, location)
+        ''', (validity, archived_at))
+        cursor.execute('''
+            INSERT INTO outbreak_alerts_migrated
+            (id, disease, location, alert_level, description_en, description_hi,
+             date_created, valid_from, expires_at)
+            SELECT id, disease, location, alert_level, description_en, description_hi, date_created,
+                   strftime('%Y-%m-%dT%H:%M:%S', date_created),
+                   strftime('%Y-%m-%dT%H:%M:%S', date_created, ?)
+            FROM outbreak_alerts
+            WHERE id IN (SELECT MAX(id) FROM outbreak_alerts GROUP BY disease, location)
+        ''', (validity,))
+        cursor.execute('DROP TABLE outbreak_alerts')
+        cursor.execute('ALTER TABLE outbreak_alerts_migrated RENAME TO outbreak_alerts')
+    
+    def archive_expired_alerts(self, batch_size=500):
+        """Move expired alerts to outbreak_alerts_archive in short batches; returns the count"""
+        archived = 0
+        conn = sqlite3.connect('health_data.db')
+        cursor = conn.cursor()
+        while True:
+            now = datetime.now().isoformat(timespec='seconds')
+            cursor.execute('''
+                SELECT id FROM outbreak_alerts WHERE expires_at <= ? ORDER BY expires_at LIMIT ?
+            ''', (now, batch_size))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            
+            placeholders = ', '.join('?' * len(ids))
+            cursor.execute(f'''
+                INSERT INTO outbreak_alerts_archive
+                (alert_id, disease, location, alert_level, description_en, description_hi,
+                 date_created, valid_from, expires_at, archived_at)
+                SELECT id, disease, location, alert_level, description_en, description_hi,
+                       date_created, valid_from, expires_at, ?
+                FROM outbreak_alerts WHERE id IN ({placeholders})
+            ''', [now] + ids)
+            cursor.execute(f'DELETE FROM outbreak_alerts WHERE id IN ({placeholders})', ids)
+            conn.commit()
+            archived += len(ids)
+            if len(ids) < batch_size:
+                break
+        conn.close()
+        if archived and self.snapshot is not None:
+            self.refresh_snapshot()
+        return archived
+    
     def detect_language(self, text):
         """Detect language of input text with support for Indian languages"""
         try:
             lang = detect(text)
             # Map various Indian languages to appropriate response language
-            indian_languages = ['hi', 'bn', 'te', 'mr', 'ta', 'gu', 'kn', 'ml', 'pa', 'or', 'as', 'ur']
-            
-            if lang in indian_languages:
-                return 'hi'  # Use Hindi for all Indian languages as fallback
+            if lang == 'hi':
+                return 'hi'
+            elif lang in REGIONAL_LANGUAGES:
+                return lang  # Answered from the translation memory
             else:
                 return 'en'  # English for others
         except (LangDetectException, Exception):
@@ -110,8 +341,20 @@ class HealthChatbot:
             else:
                 return 'en'
     
+    def detect_intent(self, user_message):
+        """Classify a message into one of INTENT_KEYWORDS, or 'general'"""
+        message_lower = user_message.lower()
+        intent_keywords = self.snapshot.intent_keywords if self.snapshot is not None else self.INTENT_KEYWORDS
+        for intent, keywords in intent_keywords:
+            if any(keyword in message_lower for keyword in keywords):
+                return intent
+        return 'general'
+    
     def get_health_system_prompt(self, language='en'):
         """Get specialized system prompt for health education"""
+        if language in REGIONAL_LANGUAGES:
+            return (self.get_health_system_prompt('en') +
+                    f"\n\nAlways reply in {REGIONAL_LANGUAGES[language]}, using simple everyday words.")
         if language == 'hi':
             return """आप एक विशेषज्ञ स्वास्थ्य शिक्षा चैटबॉट हैं जो ग्रामीण और अर्ध-शहरी आबादी की सेवा करते हैं। आपका लक्ष्य है:
 
@@ -132,11 +375,17 @@ class HealthChatbot:
 Always provide practical, understandable advice. For serious symptoms, always recommend immediate medical consultation."""
     
     def get_vaccination_info(self, language='en'):
+        """Get vaccination schedule from the reference snapshot"""
+        if language in REGIONAL_LANGUAGES:
+            return self.get_localized('vaccination_schedule', language, self.get_vaccination_info)
+        vaccination_info = self.snapshot.vaccination_info.get(language)
+        return vaccination_info if vaccination_info is not None else self.load_vaccination_info(language)
+    
+    def load_vaccination_info(self, language='en'):
         """Get vaccination schedule from database"""
         conn = sqlite3.connect('health_data.db')
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM vaccination_schedule')
-        vaccines = cursor.fetchall()
+        vaccines = fetch_schedule_rows(cursor)
         conn.close()
         
         if language == 'hi':
@@ -150,11 +399,62 @@ Always provide practical, understandable advice. For serious symptoms, always re
         
         return info
     
+    def get_vaccines_due_info(self, birth_date, language='en'):
+        """Describe overdue, due and upcoming doses for a child born on birth_date"""
+        # Due lists differ per child, so they are not translated; use Hindi
+        if language in REGIONAL_LANGUAGES:
+            language = 'hi'
+        result = self.dose_table.due_for(birth_date, language=language)
+        
+        if language == 'hi':
+            sections = [('overdue', "⚠️ छूटे हुए टीके"), ('due', "💉 अभी लगने वाले टीके"), ('upcoming', "📅 आने वाले टीके")]
+            info = f"जन्म तिथि {result['birth_date']} वाले बच्चे के लिए टीके:\n\n"
+        else:
+            sections = [('overdue', "⚠️ Overdue"), ('due', "💉 Due now"), ('upcoming', "📅 Upcoming")]
+            info = f"Vaccines for a child born on {result['birth_date']}:\n\n"
+        
+        for key, title in sections:
+            if result[key]:
+                info += f"{title}:\n"
+                for dose in result[key]:
+                    info += f"• {dose['vaccine']} ({dose['dose']}): {dose['due_date']} - {dose['due_by']}\n"
+                info += "\n"
+        
+        return info
+    
+    def get_birth_date_from_message(self, user_message):
+        """Find a birth date like 2026-03-02 or 02/03/2026 in the message"""
+        match = re.search(r'\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4}', user_message)
+        if not match:
+            return None
+        try:
+            birth_date = parse_birth_date(match.group(0))
+        except ValueError:
+            return None
+        return birth_date if birth_date <= date.today() else None
+    
     def get_outbreak_alerts(self, language='en'):
-        """Get current outbreak alerts"""
+        """Get current outbreak alerts from the reference snapshot"""
+        if language in REGIONAL_LANGUAGES:
+            return self.get_localized('outbreak_alerts', language, self.get_outbreak_alerts)
+        snapshot = self.snapshot
+        # An alert starting or expiring changes the active set without any write
+        if snapshot.valid_until and datetime.now().isoformat(timespec='seconds') >= snapshot.valid_until:
+            snapshot = self.refresh_snapshot()
+        outbreak_info = snapshot.outbreak_info.get(language)
+        return outbreak_info if outbreak_info is not None else self.load_outbreak_alerts(language)
+    
+    def load_outbreak_alerts(self, language='en'):
+        """Get current outbreak alerts from database"""
         conn = sqlite3.connect('health_data.db')
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM outbreak_alerts ORDER BY date_created DESC LIMIT 5')
+        now = datetime.now().isoformat(timespec='seconds')
+        cursor.execute('''
+            SELECT id, disease, location, alert_level, description_en, description_hi
+            FROM outbreak_alerts
+            WHERE expires_at > ? AND valid_from <= ?
+            ORDER BY valid_from DESC LIMIT 5
+        ''', (now, now))
         alerts = cursor.fetchall()
         conn.close()
         
@@ -172,6 +472,52 @@ Always provide practical, understandable advice. For serious symptoms, always re
         
         return info
     
+    def add_outbreak_alert(self, disease, location, alert_level, description_en, description_hi,
+                           valid_from=None, expires_at=None):
+        """Insert an outbreak alert, archiving the one it supersedes, and return its new id"""
+        now = datetime.now()
+        # Stored times are naive local time; an explicit UTC offset is converted
+        valid_from = to_local_time(valid_from) or now
+        expires_at = to_local_time(expires_at) or valid_from + timedelta(days=ALERT_VALIDITY_DAYS)
+        if expires_at <= valid_from:
+            raise ValueError("expires_at must be after valid_from")
+        
+        conn = sqlite3.connect('health_data.db')
+        cursor = conn.cursor()
+        # Only one row per (disease, location) can exist, so a scheduled
+        # update may not replace an alert users are seeing right now
+        if valid_from > now:
+            cursor.execute('''
+                SELECT expires_at FROM outbreak_alerts
+                WHERE disease = ? AND location = ? AND valid_from <= ? AND expires_at > ?
+            ''', (disease, location, now.isoformat(timespec='seconds'), now.isoformat(timespec='seconds')))
+            active = cursor.fetchone()
+            if active:
+                conn.close()
+                raise ValueError(f"An alert for {disease} in {location} is active until {active[0]}; "
+                                 f"post the update when it should start")
+        cursor.execute('''
+            INSERT INTO outbreak_alerts_archive
+            (alert_id, disease, location, alert_level, description_en, description_hi,
+             date_created, valid_from, expires_at, archived_at)
+            SELECT id, disease, location, alert_level, description_en, description_hi,
+                   date_created, valid_from, expires_at, ?
+            FROM outbreak_alerts WHERE disease = ? AND location = ?
+        ''', (now.isoformat(timespec='seconds'), disease, location))
+        cursor.execute('DELETE FROM outbreak_alerts WHERE disease = ? AND location = ?', (disease, location))
+        cursor.execute('''
+            INSERT INTO outbreak_alerts 
+            (disease, location, alert_level, description_en, description_hi, date_created, valid_from, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (disease, location, alert_level, description_en, description_hi, now.isoformat(timespec='seconds'),
+              valid_from.isoformat(timespec='seconds'), expires_at.isoformat(timespec='seconds')))
+        alert_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        # Other processes pick the change up through their SnapshotWatcher
+        self.refresh_snapshot()
+        return alert_id
+    
     def get_realtime_health_data(self):
         """Get real-time health data from WHO and other APIs"""
         try:
@@ -186,14 +532,17 @@ Always provide practical, understandable advice. For serious symptoms, always re
 
     def get_fallback_response(self, user_message, language='en'):
         """Provide comprehensive fallback responses when OpenAI is unavailable"""
-        message_lower = user_message.lower()
+        intent = self.detect_intent(user_message)
         
         # Vaccination info
-        if any(keyword in message_lower for keyword in ['vaccination', 'vaccine', 'टीका', 'टीकाकरण', 'immunization', 'प्रतिरक्षण']):
+        if intent == 'vaccination':
+            birth_date = self.get_birth_date_from_message(user_message)
+            if birth_date:
+                return self.get_vaccines_due_info(birth_date, language)
             return self.get_vaccination_info(language)
         
         # Outbreak alerts and real-time data
-        elif any(keyword in message_lower for keyword in ['outbreak', 'alert', 'epidemic', 'प्रकोप', 'अलर्ट', 'pandemic', 'महामारी', 'current', 'latest', 'news', 'समाचार']):
+        elif intent == 'outbreak':
             base_alerts = self.get_outbreak_alerts(language)
             realtime_data = self.get_realtime_health_data()
             if realtime_data:
@@ -203,8 +552,47 @@ Always provide practical, understandable advice. For serious symptoms, always re
                     return base_alerts + "\n\n🌐 Latest health updates retrieved from WHO."
             return base_alerts
         
+        return self.get_catalog_response(intent, language)
+    
+    def get_catalog_response(self, intent, language='en'):
+        """Static fallback content for an intent, served from the reference snapshot"""
+        if language in REGIONAL_LANGUAGES:
+            return self.get_localized(intent, language, functools.partial(self.get_catalog_response, intent))
+        snapshot = self.snapshot
+        if snapshot is not None and (intent, language) in snapshot.fallback_catalog:
+            return snapshot.fallback_catalog[(intent, language)]
+        return self.render_catalog_response(intent, language)
+    
+    def get_localized(self, content_id, language, render):
+        """Regional-language content from the translation memory, Hindi until translated"""
+        source = render('en')
+        translated = translation_memory.get(content_id, language, source)
+        if translated is None:
+            translation_memory.request(content_id, language, source)
+            return render('hi')
+        return translated
+    
+    def get_localizable_content(self):
+        """Renderers of everything get_localized serves, by content ID"""
+        content = {
+            'vaccination_schedule': self.get_vaccination_info,
+            'outbreak_alerts': self.get_outbreak_alerts
+        }
+        for intent, _ in self.INTENT_KEYWORDS + [('general', [])]:
+            if intent not in ('vaccination', 'outbreak'):
+                content[intent] = functools.partial(self.get_catalog_response, intent)
+        return content
+    
+    def get_cacheable_question(self, user_message, language, intent):
+        """Normalized question if its regional-language LLM answer may be reused, else None"""
+        if language not in REGIONAL_LANGUAGES or intent in ('vaccination', 'outbreak'):
+            return None
+        return ' '.join(user_message.lower().split()).rstrip('?।!.')
+    
+    def render_catalog_response(self, intent, language='en'):
+        """Render the static fallback content for an intent"""
         # COVID-19 related
-        elif any(keyword in message_lower for keyword in ['covid', 'coronavirus', 'corona', 'कोरोना', 'कोविड']):
+        if intent == 'covid':
             if language == 'hi':
                 return """COVID-19 के लक्षण और बचाव:
                 
@@ -245,7 +633,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 ⚠️ Seek immediate medical attention for severe symptoms."""
         
         # Fever and common symptoms
-        elif any(keyword in message_lower for keyword in ['fever', 'बुखार', 'temperature', 'तापमान', 'hot', 'गर्म']):
+        elif intent == 'fever':
             if language == 'hi':
                 return """बुखार का उपचार और देखभाल:
                 
@@ -290,7 +678,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 • Dizziness or fainting"""
         
         # Diabetes
-        elif any(keyword in message_lower for keyword in ['diabetes', 'डायबिटीज', 'मधुमेह', 'sugar', 'blood sugar', 'insulin', 'इंसुलिन']):
+        elif intent == 'diabetes':
             if language == 'hi':
                 return """मधुमेह (डायबिटीज) की जानकारी:
                 
@@ -341,7 +729,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 ⚠️ Seek immediate help if blood sugar is very low or high."""
         
         # Pregnancy and maternal health
-        elif any(keyword in message_lower for keyword in ['pregnancy', 'pregnant', 'गर्भावस्था', 'गर्भवती', 'prenatal', 'maternal', 'baby', 'बच्चा']):
+        elif intent == 'pregnancy':
             if language == 'hi':
                 return """गर्भावस्था की देखभाल:
                 
@@ -390,7 +778,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 • Persistent vomiting"""
         
         # Hypertension/Blood Pressure
-        elif any(keyword in message_lower for keyword in ['pressure', 'hypertension', 'bp', 'blood pressure', 'हाई ब्लड प्रेशर', 'उच्च रक्तचाप']):
+        elif intent == 'hypertension':
             if language == 'hi':
                 return """उच्च रक्तचाप (हाई ब्लड प्रेशर):
                 
@@ -437,7 +825,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 ⚠️ If above 180/120, go to hospital immediately."""
         
         # Mental health
-        elif any(keyword in message_lower for keyword in ['depression', 'anxiety', 'stress', 'mental health', 'अवसाद', 'चिंता', 'तनाव', 'मानसिक स्वास्थ्य']):
+        elif intent == 'mental_health':
             if language == 'hi':
                 return """मानसिक स्वास्थ्य की देखभाल:
                 
@@ -486,7 +874,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 ⚠️ If having suicidal thoughts, seek immediate help."""
         
         # First Aid
-        elif any(keyword in message_lower for keyword in ['first aid', 'emergency', 'accident', 'injury', 'प्राथमिक चिकित्सा', 'आपातकाल', 'दुर्घटना', 'चोट']):
+        elif intent == 'first_aid':
             if language == 'hi':
                 return """प्राथमिक चिकित्सा (First Aid):
                 
@@ -533,7 +921,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 ☎️ Emergency Numbers: 108, 102"""
         
         # Child health
-        elif any(keyword in message_lower for keyword in ['child', 'baby', 'infant', 'बच्चा', 'शिशु', 'pediatric', 'children']):
+        elif intent == 'child_health':
             if language == 'hi':
                 return """बच्चों का स्वास्थ्य:
                 
@@ -582,7 +970,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 • Refusing food/water"""
         
         # Common symptoms
-        elif any(keyword in message_lower for keyword in ['headache', 'cough', 'cold', 'stomach pain', 'सिरदर्द', 'खांसी', 'सर्दी', 'पेट दर्द']):
+        elif intent == 'common_symptoms':
             if language == 'hi':
                 return """सामान्य लक्षणों का इलाज:
                 
@@ -629,7 +1017,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 ⚠️ If symptoms persist for 2-3 days, see a doctor."""
         
         # Nutrition and diet
-        elif any(keyword in message_lower for keyword in ['nutrition', 'diet', 'food', 'healthy eating', 'पोषण', 'आहार', 'भोजन', 'खाना']):
+        elif intent == 'nutrition':
             if language == 'hi':
                 return """स्वस्थ आहार और पोषण:
                 
@@ -674,7 +1062,7 @@ Always provide practical, understandable advice. For serious symptoms, always re
 ⏰ Maintain regular meal times."""
         
         # Elderly care
-        elif any(keyword in message_lower for keyword in ['elderly', 'old age', 'senior', 'बुजुर्ग', 'बूढ़े', 'वृद्ध']):
+        elif intent == 'elderly_care':
             if language == 'hi':
                 return """बुजुर्गों की देखभाल:
                 
@@ -771,48 +1159,174 @@ Always provide practical, understandable advice. For serious symptoms, always re
 
 Please ask your health-related question!"""
 
-    def generate_response(self, user_message, language='en'):
+    def get_length_hint(self, max_tokens, language='en'):
+        """Ask the model to finish within its output budget instead of being cut off"""
+        words = max_tokens * 3 // 4
+        if language == 'hi':
+            return f"\n\nअपना उत्तर लगभग {words} शब्दों से कम में पूरा करें।"
+        return f"\n\nKeep your answer under about {words} words."
+    
+    def generate_response(self, user_message, language='en', channel=DEFAULT_CHANNEL):
         """Generate AI response using OpenAI with fallback"""
+        return self.generate_response_with_usage(user_message, language, channel)[0]
+    
+    def generate_response_with_usage(self, user_message, language='en', channel=DEFAULT_CHANNEL):
+        """Generate AI response; returns (response, usage) with intent, path and token counts"""
+        intent = self.detect_intent(user_message)
+        max_tokens = get_output_budget(intent, channel)
+        usage = {'intent': intent, 'path': 'fallback', 'max_tokens': max_tokens,
+                 'prompt_tokens': 0, 'completion_tokens': 0}
+        
+        # Repeated regional-language questions are answered from the translation memory
+        answer_id = None
+        question = self.get_cacheable_question(user_message, language, intent)
+        if question is not None:
+            answer_id = f"answer:{channel}:{source_hash(question)}"
+            cached = translation_memory.get(answer_id, language, question)
+            if cached is not None:
+                usage['path'] = 'cache'
+                return cached, usage
+        
+        # The model answers regional languages itself from the English data
+        context_language = 'en' if language in REGIONAL_LANGUAGES else language
         try:
+            context = None
+            
             # Check if user is asking for vaccination info
             if any(keyword in user_message.lower() for keyword in ['vaccination', 'vaccine', 'टीका', 'टीकाकरण']):
-                vaccination_info = self.get_vaccination_info(language)
-                prompt = f"User is asking about vaccinations. Here's the vaccination schedule data:\n{vaccination_info}\n\nUser question: {user_message}\n\nPlease provide a helpful response using this information."
+                context = self.get_vaccination_info(context_language)
+                birth_date = self.get_birth_date_from_message(user_message)
+                if birth_date:
+                    context += "\n" + self.get_vaccines_due_info(birth_date, context_language)
+                header = "User is asking about vaccinations. Here's the vaccination schedule data:"
             
             # Check if user is asking for outbreak alerts
             elif any(keyword in user_message.lower() for keyword in ['outbreak', 'alert', 'epidemic', 'प्रकोप', 'अलर्ट']):
-                outbreak_info = self.get_outbreak_alerts(language)
-                prompt = f"User is asking about health alerts/outbreaks. Here's the current alert data:\n{outbreak_info}\n\nUser question: {user_message}\n\nPlease provide a helpful response using this information."
+                context = self.get_outbreak_alerts(context_language)
+                header = "User is asking about health alerts/outbreaks. Here's the current alert data:"
             
+            system_prompt = self.get_health_system_prompt(language) + self.get_length_hint(max_tokens, context_language)
+            
+            # Oversized prompts are trimmed before the call: the reference data
+            # is cut first so the user's question is always sent whole
+            if context is not None:
+                question_suffix = f"\n\nUser question: {user_message}\n\nPlease provide a helpful response using this information."
+                overhead = token_counter.count_messages([
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": header + question_suffix}
+                ])
+                context = token_counter.trim(context, PROMPT_TOKEN_LIMIT - overhead)
+                prompt = f"{header}\n{context}{question_suffix}"
             else:
-                prompt = user_message
+                prompt = token_counter.trim(user_message, PROMPT_TOKEN_LIMIT - token_counter.count(system_prompt))
             
-            response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": self.get_health_system_prompt(language)},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ]
+            llm_started = time.perf_counter()
+            response, backend = llm_router.complete(
+                messages=messages,
+                max_tokens=max_tokens,
                 temperature=0.7
             )
+            content = response.choices[0].message.content
+            
+            usage.update(path='llm', backend=backend, llm_ms=round((time.perf_counter() - llm_started) * 1000, 2))
+            if response.usage:
+                usage.update(prompt_tokens=response.usage.prompt_tokens,
+                             completion_tokens=response.usage.completion_tokens)
+            else:
+                usage.update(prompt_tokens=token_counter.count_messages(messages),
+                             completion_tokens=token_counter.count(content or ''))
             
-            return response.choices[0].message.content
+            if answer_id is not None and content and \
+                    translation_memory.count_request(answer_id) >= TRANSLATION_MEMORY_MIN_REPEATS:
+                try:
+                    translation_memory.put(answer_id, language, question, content)
+                except sqlite3.Error as e:
+                    logger.warning("Translation memory write error: %s", e)
+            return content, usage
             
         except Exception as e:
-            print(f"OpenAI API Error: {str(e)}")  # Add error logging
+            logger.warning("LLM completion failed, using fallback: %s", e, extra={'intent': intent})
             # Return fallback response instead of generic error
-            return self.get_fallback_response(user_message, language)
+            return self.get_fallback_response(user_message, language), usage
 
-# Initialize chatbot
+# Initialize chatbot. Under serve.py this runs once in the pre-fork master,
+# so only one process migrates and seeds health_data.db, and the workers'
+# background threads are started after fork by start_worker_services().
 chatbot = HealthChatbot()
+analytics = AnalyticsStore(start=not PREFORK)
+atexit.register(analytics.close)
+translation_memory = TranslationMemory(translate_text, start=not PREFORK)
+alert_broker = AlertBroker(start=not PREFORK)
+snapshot_watcher = SnapshotWatcher(on_change=chatbot.refresh_snapshot)
+
+def start_worker_services():
+    """Start the per-process background threads of a request-serving process"""
+    # Threads do not survive fork, so under serve.py these objects are built
+    # with start=False in the master and each worker starts them here
+    analytics.start()
+    alert_broker.start()
+    translation_memory.start()
+    snapshot_watcher.start()
+
+def run_alert_archiver():
+    """Periodically move expired alerts out of the active table"""
+    while True:
+        try:
+            archived = chatbot.archive_expired_alerts()
+            if archived:
+                logger.info("Archived %d expired outbreak alerts", archived)
+        except sqlite3.Error as e:
+            logger.error("Alert archive error: %s", e)
+        time.sleep(ALERT_ARCHIVE_INTERVAL_SECONDS)
+
+def start_alert_archiver():
+    """Start the archival job; with several workers only the master runs it"""
+    threading.Thread(target=run_alert_archiver, name='alert-archiver', daemon=True).start()
+
+if not PREFORK:
+    snapshot_watcher.start()
+    start_alert_archiver()
+
+def is_admin_request():
+    """Check the X-Admin-Token header against ADMIN_TOKEN"""
+    return bool(ADMIN_TOKEN) and request.headers.get('X-Admin-Token') == ADMIN_TOKEN
+
+profiler = RequestProfiler(sample_percent=PROFILE_SAMPLE_PERCENT)
+
+def profiled(view):
+    """Profile a view when an admin asks for it (X-Profile: 1 or ?profile=1) or by sampling"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        requested = request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+        if requested and is_admin_request():
+            reason = 'admin'
+        elif profiler.should_sample():
+            reason = 'sampled'
+        else:
+            return view(*args, **kwargs)
+        
+        result, trace = profiler.run(request.path, reason, view, *args, **kwargs)
+        
+        @after_this_request
+        def add_profile_header(response):
+            response.headers['X-Profile-Id'] = str(trace.id)
+            return response
+        
+        return result
+    return wrapper
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/chat', methods=['POST'])
+@profiled
 def chat():
+    started = time.perf_counter()
     try:
         data = request.json
         if not data:
@@ -824,26 +1338,65 @@ def chat():
             return jsonify({'error': 'Message cannot be empty'}), 400
         
         # Use preferred language if provided, otherwise detect
-        if preferred_language in ['hi', 'en']:
+        if preferred_language in SUPPORTED_LANGUAGES:
             detected_language = preferred_language
         else:
             detected_language = chatbot.detect_language(user_message)
+        detected = time.perf_counter()
+        
+        # Delivery channel decides the output budget (SMS answers are short)
+        channel = data.get('channel', DEFAULT_CHANNEL)
+        if channel not in CHANNEL_OUTPUT_LIMITS:
+            channel = DEFAULT_CHANNEL
         
         # Generate response - always return 200 with fallback if needed
         try:
-            response = chatbot.generate_response(user_message, detected_language)
+            response, usage = chatbot.generate_response_with_usage(user_message, detected_language, channel)
         except Exception as e:
-            print(f"OpenAI API failed, using fallback: {str(e)}")
+            logger.exception("Response generation failed, using fallback: %s", e)
             response = chatbot.get_fallback_response(user_message, detected_language)
+            usage = {'intent': chatbot.detect_intent(user_message), 'path': 'fallback',
+                     'prompt_tokens': 0, 'completion_tokens': 0}
+        generated = time.perf_counter()
+        
+        analytics.record(
+            intent=usage['intent'],
+            language=detected_language,
+            location=data.get('location', ''),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            message=user_message,
+            prompt_tokens=usage['prompt_tokens'],
+            completion_tokens=usage['completion_tokens']
+        )
         
-        return jsonify({
+        payload = jsonify({
             'response': response,
             'detected_language': detected_language,
             'timestamp': datetime.now().isoformat()
-        }), 200
+        })
+        finished = time.perf_counter()
+        
+        logger.info("chat request", extra={
+            'sampled': True,
+            'language': detected_language,
+            'channel': channel,
+            'intent': usage['intent'],
+            'path': usage['path'],
+            'backend': usage.get('backend'),
+            'prompt_tokens': usage['prompt_tokens'],
+            'completion_tokens': usage['completion_tokens'],
+            'timings_ms': {
+                'detect': round((detected - started) * 1000, 2),
+                'generate': round((generated - detected) * 1000, 2),
+                'llm': usage.get('llm_ms'),
+                'serialize': round((finished - generated) * 1000, 2),
+                'total': round((finished - started) * 1000, 2)
+            }
+        })
+        return payload, 200
         
     except Exception as e:
-        print(f"Chat endpoint error: {str(e)}")
+        logger.exception("Chat endpoint error: %s", e)
         # Always return fallback response with 200 status
         try:
             safe_message = user_message if 'user_message' in locals() and user_message else "हैलो"
@@ -860,9 +1413,179 @@ def chat():
                 'timestamp': datetime.now().isoformat()
             }), 200
 
+def get_due_params():
+    """Read the shared as-of date and horizon query parameters"""
+    on = request.args.get('on')
+    on = parse_birth_date(on) if on else date.today()
+    horizon_days = int(request.args.get('horizon', DEFAULT_HORIZON_DAYS))
+    if horizon_days < 0:
+        raise ValueError("horizon must not be negative")
+    return on, horizon_days
+
+@app.route('/vaccines/due')
+def vaccines_due():
+    dob = request.args.get('dob', '').strip()
+    if not dob:
+        return jsonify({'error': 'dob query parameter is required'}), 400
+    
+    try:
+        birth_date = parse_birth_date(dob)
+        on, horizon_days = get_due_params()
+        language = request.args.get('language', 'en')
+        result = chatbot.dose_table.due_for(birth_date, on, horizon_days, language)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(result)
+
+@app.route('/vaccines/due/bulk', methods=['POST'])
+@profiled
+def vaccines_due_bulk():
+    upload = request.files.get('file')
+    try:
+        text = upload.read().decode('utf-8-sig') if upload else request.get_data(as_text=True)
+    except ValueError:
+        return jsonify({'error': 'CSV roster must be UTF-8 encoded'}), 400
+    if not text.strip():
+        return jsonify({'error': 'CSV roster with child_id and birth_date columns is required'}), 400
+    
+    try:
+        on, horizon_days = get_due_params()
+        children, errors = read_roster_csv(text)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    results, due_errors = chatbot.dose_table.bulk_due(children, on, horizon_days)
+    errors.extend(due_errors)
+    
+    if request.args.get('format') == 'csv':
+        return Response(write_due_csv(results), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=vaccines_due.csv'})
+    
+    return jsonify({
+        'as_of': on.isoformat(),
+        'count': len(results),
+        'results': results,
+        'errors': errors
+    })
+
+@app.route('/alerts', methods=['POST'])
+def create_alert():
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    data = request.json or {}
+    fields = ['disease', 'location', 'alert_level', 'description_en', 'description_hi']
+    missing = [field for field in fields if not str(data.get(field, '')).strip()]
+    if missing:
+        return jsonify({'error': f"Missing fields: {', '.join(missing)}"}), 400
+    
+    try:
+        valid_from = datetime.fromisoformat(data['valid_from']) if data.get('valid_from') else None
+        expires_at = datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None
+        if expires_at is None and data.get('valid_days'):
+            expires_at = (valid_from or datetime.now()) + timedelta(days=int(data['valid_days']))
+        alert_id = chatbot.add_outbreak_alert(*(str(data[field]).strip() for field in fields),
+                                              valid_from=valid_from, expires_at=expires_at)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    alert_broker.notify()
+    return jsonify({'id': alert_id}), 201
+
+@app.route('/alerts/archive', methods=['POST'])
+def archive_alerts():
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    return jsonify({'archived': chatbot.archive_expired_alerts()})
+
+@app.route('/admin/translations/prefetch', methods=['POST'])
+def prefetch_translations():
+    """Queue the fallback content for translation ahead of the first request"""
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    languages = request.args.get('languages')
+    languages = languages.split(',') if languages else list(REGIONAL_LANGUAGES)
+    unknown = [language for language in languages if language not in REGIONAL_LANGUAGES]
+    if unknown:
+        return jsonify({'error': f"Unsupported languages: {', '.join(unknown)}"}), 400
+    
+    queued = 0
+    for content_id, render in chatbot.get_localizable_content().items():
+        source = render('en')
+        for language in languages:
+            if translation_memory.get(content_id, language, source) is None:
+                queued += translation_memory.request(content_id, language, source)
+    return jsonify({'queued': queued, 'languages': languages}), 202
+
+@app.route('/alerts/stream')
+def alerts_stream():
+    locations = request.args.get('location', '').split(',')
+    subscriber = alert_broker.subscribe(locations)
+    if subscriber is None:
+        return jsonify({'error': 'Too many subscribers, try again later'}), 503
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    response = Response(
+        stream_with_context(alert_broker.stream(subscriber, last_event_id)),
+        mimetype='text/event-stream',
+        headers={'X-Accel-Buffering': 'no'}
+    )
+    # The stream's own cleanup never runs if its body is not iterated (HEAD)
+    response.call_on_close(lambda: alert_broker.unsubscribe(subscriber))
+    return response
+
+@app.route('/analytics')
+def analytics_stats():
+    # Top questions are users' own words, so the stats are admin-only
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    try:
+        hours = int(request.args.get('hours', 24))
+        top = int(request.args.get('top', 10))
+    except ValueError:
+        return jsonify({'error': 'hours and top must be integers'}), 400
+    return jsonify(analytics.get_stats(hours, top))
+
+@app.route('/admin/profiles')
+def list_profiles():
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    return jsonify({'profiles': profiler.list_traces()})
+
+@app.route('/admin/profiles/<int:trace_id>')
+def download_profile(trace_id):
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    trace = profiler.get_trace(trace_id)
+    if trace is None:
+        return jsonify({'error': 'Profile not found or already evicted'}), 404
+    
+    if request.args.get('format', 'speedscope') == 'collapsed':
+        return Response(trace.to_collapsed(), mimetype='text/plain',
+                        headers={'Content-Disposition': f'attachment; filename=profile-{trace_id}.folded'})
+    
+    response = jsonify(trace.to_speedscope())
+    response.headers['Content-Disposition'] = f'attachment; filename=profile-{trace_id}.speedscope.json'
+    return response
+
 @app.route('/health')
 def health_check():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+    return jsonify({
+        'status': 'healthy',
+        'alert_stream': alert_broker.get_stats(),
+        'llm': llm_router.get_stats(),
+        'logging': structured_logging.get_stats(),
+        'translation_memory': translation_memory.get_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
 
 # Add missing /api endpoint to stop 404 errors  
 @app.route('/api', methods=['GET', 'HEAD'])
@@ -0,0 +1,69 @@
+"""Benchmark outbreak alert reads against years of accumulated history.
+
+Runs in a temporary directory so the real health_data.db is untouched:
+
+    python benchmarks/bench_alerts.py [history_rows]
+"""
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+os.chdir(tempfile.mkdtemp())
+
+from app import HealthChatbot
+
+
+def fill_history(rows):
+    """Insert expired alerts spread over the last five years, plus a few active ones"""
+    now = datetime.now()
+    history = []
+    for i in range(rows):
+        created = now - timedelta(days=40 + i % (5 * 365), seconds=i)
+        history.append((f"Disease {i}", f"District {i}", "Low", "Expired alert", "पुराना अलर्ट",
+                        created.isoformat(timespec='seconds'), created.isoformat(timespec='seconds'),
+                        (created + timedelta(days=30)).isoformat(timespec='seconds')))
+    for i in range(20):
+        history.append((f"Active {i}", "Delhi", "High", "Active alert", "सक्रिय अलर्ट",
+                        now.isoformat(timespec='seconds'), now.isoformat(timespec='seconds'),
+                        (now + timedelta(days=30)).isoformat(timespec='seconds')))
+
+    conn = sqlite3.connect('health_data.db')
+    conn.executemany('''
+        INSERT INTO outbreak_alerts
+        (disease, location, alert_level, description_en, description_hi, date_created, valid_from, expires_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', history)
+    conn.commit()
+    conn.close()
+
+
+def time_reads(chatbot, label, reads=200):
+    # get_outbreak_alerts() serves the cached snapshot; time the table query itself
+    start = time.perf_counter()
+    for _ in range(reads):
+        chatbot.load_outbreak_alerts()
+    elapsed = (time.perf_counter() - start) / reads
+    print(f"{label:<28} {elapsed * 1e6:10.1f} us/read")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    chatbot = HealthChatbot()
+    fill_history(rows)
+
+    print(f"{rows} historical alerts")
+    time_reads(chatbot, "before archiving")
+    start = time.perf_counter()
+    archived = chatbot.archive_expired_alerts(batch_size=5000)
+    print(f"{'archive ' + str(archived) + ' rows':<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    time_reads(chatbot, "after archiving")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark the immunization due-date engine over a synthetic roster.
+
+Run from the repository root:
+
+    python benchmarks/bench_immunization.py [children]
+"""
+import os
+import sys
+import time
+import random
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from immunization import DoseTable, read_roster_csv, write_due_csv
+
+
+def build_roster_csv(children, on):
+    rng = random.Random(42)
+    lines = ['child_id,birth_date']
+    for child_id in range(children):
+        birth_date = on - timedelta(days=rng.randint(0, 5 * 365))
+        lines.append(f"C{child_id:06d},{birth_date.isoformat()}")
+    return '\n'.join(lines) + '\n'
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<20} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    children = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    on = date(2026, 10, 1)
+    dose_table = DoseTable.from_db()
+    roster = build_roster_csv(children, on)
+
+    print(f"{children} children, {len(dose_table.doses)} doses")
+    parsed, errors = timed("parse CSV", read_roster_csv, roster)
+    results, _ = timed("classify roster", dose_table.bulk_due, parsed, on)
+    timed("write CSV", write_due_csv, results)
+
+    start = time.perf_counter()
+    for _, birth_date in parsed[:1000]:
+        dose_table.due_for(birth_date, on)
+    per_child = (time.perf_counter() - start) / min(len(parsed), 1000)
+    print(f"{'single child':<20} {per_child * 1e6:10.1f} us")
+
+
+if __name__ == '__main__':
+    main()
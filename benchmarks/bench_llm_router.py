@@ -0,0 +1,66 @@
+"""Compare LLM router tail latency with and without hedging against stub backends.
+
+    python benchmarks/bench_llm_router.py [requests]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_router import LLMBackend, LLMRouter
+from stub_llm_server import serve
+
+STUBS = [
+    # A fast remote endpoint that occasionally stalls, and a steadier local model
+    {'name': 'remote', 'port': 18081, 'latency': 0.05, 'jitter': 0.02, 'tail_latency': 1.0, 'tail_rate': 0.03},
+    {'name': 'local-cpu', 'port': 18082, 'latency': 0.15, 'jitter': 0.05},
+]
+
+
+def start_stubs():
+    for stub in STUBS:
+        server = serve(stub['port'], stub['name'], stub['latency'], stub.get('jitter', 0.0),
+                       stub.get('tail_latency', 0.0), stub.get('tail_rate', 0.0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def build_router(hedge):
+    backends = [
+        LLMBackend(stub['name'], 'stub', base_url=f"http://127.0.0.1:{stub['port']}/v1", timeout=10)
+        for stub in STUBS
+    ]
+    return LLMRouter(backends, hedge=hedge, hedge_after=0.3, min_samples=20)
+
+
+def run(router, requests):
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        router.complete([{'role': 'user', 'content': 'BCG kab lagta hai?'}], max_tokens=50)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return percentile(0.5), percentile(0.95), percentile(0.99)
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    start_stubs()
+    time.sleep(0.2)
+
+    for hedge in (False, True):
+        router = build_router(hedge)
+        p50, p95, p99 = run(router, requests)
+        stats = router.get_stats()
+        print(f"hedge={str(hedge):<5} p50={p50:7.1f} ms  p95={p95:7.1f} ms  p99={p99:7.1f} ms  "
+              f"hedges sent={stats['hedges_sent']} won={stats['hedges_won']}")
+
+
+if __name__ == '__main__':
+    main()
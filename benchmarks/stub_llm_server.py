@@ -0,0 +1,81 @@
+"""Minimal OpenAI-compatible chat completions server with injected latency.
+
+Stands in for a remote or local model endpoint when exercising the LLM
+router:
+
+    python benchmarks/stub_llm_server.py --port 8081 --latency 0.2 --tail-latency 2 --tail-rate 0.05
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(name, latency, jitter, tail_latency, tail_rate, error_rate):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            delay = latency + random.uniform(0, jitter)
+            if random.random() < tail_rate:
+                delay += tail_latency
+            time.sleep(delay)
+
+            if random.random() < error_rate:
+                self.send_response(500)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(json.dumps({'error': {'message': 'injected failure'}}).encode())
+                return
+
+            prompt_tokens = sum(len(message.get('content', '').split()) for message in body.get('messages', []))
+            content = f"[{name}] stub answer after {delay:.3f}s"
+            payload = {
+                'id': f"chatcmpl-{name}-{time.time_ns()}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': body.get('model', name),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': len(content.split()),
+                    'total_tokens': prompt_tokens + len(content.split())
+                }
+            }
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(json.dumps(payload).encode())
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def serve(port, name='stub', latency=0.1, jitter=0.0, tail_latency=0.0, tail_rate=0.0, error_rate=0.0):
+    """Create a stub server on localhost:port; call serve_forever() on the result"""
+    handler = make_handler(name, latency, jitter, tail_latency, tail_rate, error_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--name', default='stub')
+    parser.add_argument('--latency', type=float, default=0.1, help='base latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra uniform random latency in seconds')
+    parser.add_argument('--tail-latency', type=float, default=0.0, help='extra latency for slow requests')
+    parser.add_argument('--tail-rate', type=float, default=0.0, help='fraction of requests that are slow')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that return 500')
+    args = parser.parse_args()
+
+    server = serve(args.port, args.name, args.latency, args.jitter, args.tail_latency, args.tail_rate, args.error_rate)
+    print(f"Stub LLM '{args.name}' listening on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
@@ -8,6 +8,8 @@ class HealthChatbot {
         this.loadingIndicator = document.getElementById('loadingIndicator');
         this.chatModal = document.getElementById('chatModal');
         this.currentLanguage = 'en';
+        this.location = localStorage.getItem('healthMitraLocation') || '';
+        this.alertSource = null;
         
         this.init();
     }
@@ -29,6 +31,38 @@ class HealthChatbot {
         
         // Add quick action buttons to initial bot message
         this.addQuickActions();
+        
+        // Listen for new outbreak alerts pushed by the server
+        this.subscribeToAlerts();
+    }
+    
+    subscribeToAlerts(location = this.location) {
+        if (!window.EventSource) return;
+        
+        if (this.alertSource) {
+            this.alertSource.close();
+        }
+        
+        this.location = location;
+        localStorage.setItem('healthMitraLocation', location);
+        
+        // EventSource reconnects on its own and sends Last-Event-ID,
+        // so alerts missed while disconnected are replayed by the server
+        const query = location ? `?location=${encodeURIComponent(location)}` : '';
+        this.alertSource = new EventSource(`/alerts/stream${query}`);
+        
+        this.alertSource.addEventListener('alert', (event) => {
+            const alert = JSON.parse(event.data);
+            if (this.currentLanguage === 'hi') {
+                this.addMessage(`⚠️ ${alert.location} में ${alert.disease} - ${alert.alert_level} स्तर\n${alert.description_hi}`, 'bot', 'hi');
+            } else {
+                this.addMessage(`⚠️ ${alert.disease} in ${alert.location} - ${alert.alert_level} level\n${alert.description_en}`, 'bot', 'en');
+            }
+        });
+        
+        this.alertSource.onerror = () => {
+            console.warn('Alert stream disconnected, retrying...');
+        };
     }
     
     addQuickActions() {
@@ -96,7 +130,8 @@ class HealthChatbot {
                 },
                 body: JSON.stringify({ 
                     message: message,
-                    preferred_language: this.currentLanguage 
+                    preferred_language: this.currentLanguage,
+                    location: this.location
                 })
             });
             
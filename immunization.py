@@ -0,0 +1,201 @@
+import re
+import csv
+import io
+import sqlite3
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import date, datetime
+
+# Offsets are kept in whole days so a whole roster can be classified with
+# plain integer comparisons against the child's age in days.
+DAYS_PER_UNIT = {'day': 1, 'week': 7, 'month': 30.4375, 'year': 365.25}
+
+# A dose given at a single age ("6 weeks") is still considered due for this
+# many days before it is reported as overdue.
+DEFAULT_GRACE_DAYS = 28
+
+# How far ahead (in days) doses are reported as upcoming.
+DEFAULT_HORIZON_DAYS = 28
+
+AGE_ITEM_PATTERN = re.compile(r'^(\d+)(?:\s*-\s*(\d+))?\s*(day|week|month|year)s?$', re.IGNORECASE)
+
+Dose = namedtuple('Dose', ['vaccine', 'label', 'start_day', 'end_day', 'description_en', 'description_hi'])
+
+
+def parse_age_group(age_group, grace_days=DEFAULT_GRACE_DAYS):
+    """Parse free text like "Birth, 6 weeks, 9-12 months" into (label, start_day, end_day) tuples"""
+    doses = []
+    for item in age_group.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        if item.lower() == 'birth':
+            doses.append((item, 0, grace_days))
+            continue
+
+        match = AGE_ITEM_PATTERN.match(item)
+        if not match:
+            raise ValueError(f"Unrecognised age group entry: {item!r}")
+
+        low, high, unit = match.groups()
+        days = DAYS_PER_UNIT[unit.lower()]
+        start_day = round(int(low) * days)
+        end_day = round(int(high) * days) if high else start_day + grace_days
+        doses.append((item, start_day, end_day))
+    return doses
+
+
+def parse_birth_date(value):
+    """Parse an ISO (YYYY-MM-DD) or DD/MM/YYYY birth date"""
+    value = value.strip()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in ('%d/%m/%Y', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date: {value!r}")
+
+
+def fetch_schedule_rows(cursor, columns='*'):
+    """One row per vaccine from vaccination_schedule (the lowest id of each), in id order"""
+    cursor.execute(f'''
+        SELECT {columns} FROM vaccination_schedule
+        WHERE id IN (SELECT MIN(id) FROM vaccination_schedule GROUP BY vaccine_name)
+        ORDER BY id
+    ''')
+    return cursor.fetchall()
+
+
+class DoseTable:
+    """Structured dose table parsed once from the vaccination_schedule table"""
+
+    def __init__(self, doses):
+        self.doses = sorted(doses, key=lambda dose: (dose.start_day, dose.vaccine))
+        self.starts = [dose.start_day for dose in self.doses]
+
+    @classmethod
+    def from_db(cls, db_path='health_data.db', grace_days=DEFAULT_GRACE_DAYS):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        rows = fetch_schedule_rows(cursor, 'vaccine_name, age_group, description_en, description_hi')
+        conn.close()
+
+        doses = []
+        for vaccine_name, age_group, description_en, description_hi in rows:
+            for label, start_day, end_day in parse_age_group(age_group, grace_days):
+                doses.append(Dose(vaccine_name, label, start_day, end_day, description_en, description_hi))
+        return cls(doses)
+
+    def classify_age(self, age_days, horizon_days=DEFAULT_HORIZON_DAYS):
+        """Return (overdue, due, upcoming) dose indexes for a child aged age_days"""
+        started = bisect_right(self.starts, age_days)
+        overdue = tuple(i for i in range(started) if self.doses[i].end_day < age_days)
+        due = tuple(i for i in range(started) if self.doses[i].end_day >= age_days)
+        upcoming = tuple(range(started, bisect_right(self.starts, age_days + horizon_days, lo=started)))
+        return overdue, due, upcoming
+
+    def dose_info(self, index, birth_date, language='en'):
+        dose = self.doses[index]
+        return {
+            'vaccine': dose.vaccine,
+            'dose': dose.label,
+            'due_date': date.fromordinal(birth_date.toordinal() + dose.start_day).isoformat(),
+            'due_by': date.fromordinal(birth_date.toordinal() + dose.end_day).isoformat(),
+            'description': dose.description_hi if language == 'hi' else dose.description_en
+        }
+
+    def due_for(self, birth_date, on=None, horizon_days=DEFAULT_HORIZON_DAYS, language='en'):
+        """Compute overdue, due and upcoming doses for a single child"""
+        on = on or date.today()
+        age_days = (on - birth_date).days
+        if age_days < 0:
+            raise ValueError("Birth date is after the reference date")
+
+        overdue, due, upcoming = self.classify_age(age_days, horizon_days)
+        return {
+            'birth_date': birth_date.isoformat(),
+            'as_of': on.isoformat(),
+            'age_days': age_days,
+            'overdue': [self.dose_info(i, birth_date, language) for i in overdue],
+            'due': [self.dose_info(i, birth_date, language) for i in due],
+            'upcoming': [self.dose_info(i, birth_date, language) for i in upcoming]
+        }
+
+    def bulk_due(self, children, on=None, horizon_days=DEFAULT_HORIZON_DAYS):
+        """Classify a roster of (child_id, birth_date) pairs, once per distinct age"""
+        on_ordinal = (on or date.today()).toordinal()
+        labels = [f"{dose.vaccine} ({dose.label})" for dose in self.doses]
+        by_age = {}
+        results = []
+        errors = []
+
+        for child_id, birth_date in children:
+            age_days = on_ordinal - birth_date.toordinal()
+            if age_days < 0:
+                errors.append({'child_id': child_id, 'error': 'Birth date is after the reference date'})
+                continue
+
+            statuses = by_age.get(age_days)
+            if statuses is None:
+                statuses = tuple(
+                    [labels[i] for i in indexes]
+                    for indexes in self.classify_age(age_days, horizon_days)
+                )
+                by_age[age_days] = statuses
+
+            overdue, due, upcoming = statuses
+            results.append({
+                'child_id': child_id,
+                'birth_date': birth_date.isoformat(),
+                'age_days': age_days,
+                'overdue': overdue,
+                'due': due,
+                'upcoming': upcoming
+            })
+
+        return results, errors
+
+
+def read_roster_csv(text):
+    """Read a roster CSV with child_id and birth_date (or dob) columns into (children, errors)"""
+    reader = csv.DictReader(io.StringIO(text))
+    fieldnames = [name.strip().lower() for name in (reader.fieldnames or [])]
+    reader.fieldnames = fieldnames
+    date_column = 'birth_date' if 'birth_date' in fieldnames else 'dob'
+    if date_column not in fieldnames:
+        raise ValueError("CSV must have a 'birth_date' or 'dob' column")
+
+    children = []
+    errors = []
+    for line_number, row in enumerate(reader, start=2):
+        child_id = (row.get('child_id') or '').strip() or str(line_number - 1)
+        try:
+            children.append((child_id, parse_birth_date(row.get(date_column) or '')))
+        except ValueError as e:
+            errors.append({'child_id': child_id, 'line': line_number, 'error': str(e)})
+    return children, errors
+
+
+def write_due_csv(results):
+    """Serialise bulk_due results as CSV, one row per child"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['child_id', 'birth_date', 'age_days', 'overdue', 'due', 'upcoming'])
+
+    # Children of the same age share the same dose lists, so join them once
+    joined = {}
+    rows = []
+    for result in results:
+        age_days = result['age_days']
+        statuses = joined.get(age_days)
+        if statuses is None:
+            statuses = ['; '.join(result[key]) for key in ('overdue', 'due', 'upcoming')]
+            joined[age_days] = statuses
+        rows.append([result['child_id'], result['birth_date'], age_days, *statuses])
+
+    writer.writerows(rows)
+    return output.getvalue()
@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    """One OpenAI-compatible endpoint with rolling latency and error stats"""
+
+    def __init__(self, name, model, base_url=None, api_key=None, timeout=30.0, window=100):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        # Retries are handled by the router (failover and hedging), not the SDK
+        self.client = OpenAI(base_url=base_url, api_key=api_key or 'not-needed', timeout=timeout, max_retries=0)
+        self.samples = deque(maxlen=window)
+        self.unhealthy_until = 0.0
+        self.lock = threading.Lock()
+
+    def complete(self, messages, **params):
+        return self.client.chat.completions.create(model=self.model, messages=messages, **params)
+
+    def record(self, latency, ok, cooldown=30.0, failure_threshold=0.5, min_samples=5):
+        with self.lock:
+            self.samples.append((latency, ok))
+            recent = list(self.samples)[-min_samples:]
+            failures = sum(1 for _, sample_ok in recent if not sample_ok)
+            if len(recent) >= min_samples and failures / len(recent) >= failure_threshold:
+                self.unhealthy_until = time.monotonic() + cooldown
+
+    def latency_percentile(self, percentile):
+        with self.lock:
+            latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+    def error_rate(self):
+        with self.lock:
+            if not self.samples:
+                return 0.0
+            return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def is_healthy(self):
+        return time.monotonic() >= self.unhealthy_until
+
+    def successful_samples(self):
+        with self.lock:
+            return sum(1 for _, ok in self.samples if ok)
+
+    def get_stats(self):
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        return {
+            'name': self.name,
+            'model': self.model,
+            'base_url': self.base_url,
+            'healthy': self.is_healthy(),
+            'requests': len(self.samples),
+            'error_rate': round(self.error_rate(), 3),
+            'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+
+class LLMRouter:
+    """Routes chat completions to the fastest healthy backend, with failover and optional hedging"""
+
+    def __init__(self, backends, hedge=False, hedge_after=2.0, min_samples=20, max_workers=32,
+                 cooldown=30.0, failure_threshold=0.5, explore_every=20):
+        self.backends = backends
+        # Every Nth request goes to an untried backend first, so new or
+        # recovered endpoints get probed without taking the lead by default
+        self.explore_every = explore_every
+        self.request_count = itertools.count(1)
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.failure_threshold = failure_threshold
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm')
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build from LLM_BACKENDS (a JSON list), defaulting to OpenAI gpt-4o-mini"""
+        config = json.loads(os.environ.get('LLM_BACKENDS') or '[]') or [
+            {'name': 'openai', 'model': 'gpt-4o-mini', 'api_key_env': 'OPENAI_API_KEY'}
+        ]
+        backends = [
+            LLMBackend(
+                name=entry.get('name', entry['model']),
+                model=entry['model'],
+                base_url=entry.get('base_url'),
+                api_key=os.environ.get(entry.get('api_key_env', '')) or entry.get('api_key'),
+                timeout=float(entry.get('timeout', 30.0))
+            )
+            for entry in config
+        ]
+        return cls(
+            backends,
+            hedge=os.environ.get('LLM_HEDGE', '0') == '1',
+            hedge_after=float(os.environ.get('LLM_HEDGE_AFTER', '2.0'))
+        )
+
+    def ranked_backends(self):
+        def score(backend):
+            # Proven backends first by error-weighted p50, then untried ones,
+            # then ones that have only ever failed
+            p50 = backend.latency_percentile(0.5)
+            if p50 is not None:
+                return (0, p50 * (1 + 4 * backend.error_rate()))
+            return (2, 0.0) if backend.error_rate() > 0 else (1, 0.0)
+
+        healthy = [backend for backend in self.backends if backend.is_healthy()]
+        # When everything is marked unhealthy, still try them rather than fail outright
+        ranked = sorted(healthy or self.backends, key=score)
+        untried = [backend for backend in ranked if score(backend)[0] == 1]
+        if untried and ranked[0] is not untried[0] and next(self.request_count) % self.explore_every == 0:
+            ranked.remove(untried[0])
+            ranked.insert(0, untried[0])
+        return ranked
+
+    def hedge_deadline(self, backend):
+        if backend.successful_samples() < self.min_samples:
+            return self.hedge_after
+        return backend.latency_percentile(0.95)
+
+    def call(self, backend, messages, params):
+        started = time.perf_counter()
+        try:
+            response = backend.complete(messages, **params)
+        except Exception:
+            backend.record(time.perf_counter() - started, False, self.cooldown, self.failure_threshold)
+            raise
+        backend.record(time.perf_counter() - started, True, self.cooldown, self.failure_threshold)
+        return response
+
+    def complete(self, messages, **params):
+        """Return (response, backend_name) from the first backend to succeed"""
+        candidates = self.ranked_backends()
+        if not candidates:
+            raise RuntimeError("No LLM backends configured")
+        pending = {}
+        last_error = None
+        hedge = None
+
+        def submit():
+            backend = candidates.pop(0)
+            future = self.executor.submit(self.call, backend, messages, params)
+            pending[future] = backend
+            return future
+
+        deadline = time.monotonic() + self.hedge_deadline(candidates[0])
+        submit()
+
+        while pending:
+            timeout = None
+            if self.hedge and hedge is None and candidates:
+                timeout = max(0.0, deadline - time.monotonic())
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Primary passed its p95 without answering: hedge to the runner-up
+                self.hedges_sent += 1
+                hedge = submit()
+                continue
+
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning("LLM backend %s failed: %s", backend.name, e, extra={'backend': backend.name})
+                    continue
+
+                for loser in pending:
+                    loser.cancel()
+                if future is hedge:
+                    self.hedges_won += 1
+                return response, backend.name
+
+            # Everything in flight failed: fail over to the next backend
+            if not pending and candidates:
+                submit()
+
+        raise last_error
+
+    def get_stats(self):
+        return {
+            'hedging': self.hedge,
+            'hedges_sent': self.hedges_sent,
+            'hedges_won': self.hedges_won,
+            'backends': [backend.get_stats() for backend in self.backends]
+        }
@@ -0,0 +1,144 @@
+import os
+import sys
+import time
+import random
+import itertools
+import threading
+from collections import Counter, deque
+from datetime import datetime
+
+
+def frame_label(code):
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Trace:
+    """Stack samples collected for one profiled request"""
+
+    def __init__(self, trace_id, label, reason, interval):
+        self.id = trace_id
+        self.label = label
+        self.reason = reason
+        self.interval = interval
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.duration_ms = 0.0
+        self.samples = Counter()
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'label': self.label,
+            'reason': self.reason,
+            'started_at': self.started_at,
+            'duration_ms': round(self.duration_ms, 2),
+            'samples': sum(self.samples.values()),
+            'interval_ms': self.interval * 1000
+        }
+
+    def to_collapsed(self):
+        """Brendan Gregg's collapsed-stack format, one "a;b;c count" line per stack"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def to_speedscope(self):
+        """Speedscope sampled-profile JSON (https://www.speedscope.app)"""
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        for stack, count in self.samples.items():
+            indexes = []
+            for name in stack:
+                if name not in frame_index:
+                    frame_index[name] = len(frames)
+                    frames.append({'name': name})
+                indexes.append(frame_index[name])
+            samples.append(indexes)
+            weights.append(round(count * self.interval * 1000, 3))
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': f"{self.label} #{self.id}",
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights
+            }],
+            'name': f"{self.label} #{self.id}",
+            'activeProfileIndex': 0,
+            'exporter': 'health-mitra'
+        }
+
+
+class RequestProfiler:
+    """Opt-in stack-sampling profiler for individual requests"""
+
+    def __init__(self, sample_percent=0.0, interval=0.002, max_traces=50):
+        self.sample_percent = sample_percent
+        self.interval = interval
+        self.traces = deque(maxlen=max_traces)
+        self.ids = itertools.count(1)
+        self.active = {}
+        self.lock = threading.Lock()
+        self.sampler = None
+
+    def should_sample(self):
+        return self.sample_percent > 0 and random.random() * 100 < self.sample_percent
+
+    def run(self, label, reason, func, *args, **kwargs):
+        """Call func while sampling this thread; returns (result, trace)"""
+        trace = Trace(next(self.ids), label, reason, self.interval)
+        thread_id = threading.get_ident()
+        root = sys._getframe()
+        with self.lock:
+            self.active[thread_id] = (trace, root)
+            self.ensure_sampler()
+
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs), trace
+        finally:
+            trace.duration_ms = (time.perf_counter() - started) * 1000
+            with self.lock:
+                self.active.pop(thread_id, None)
+            self.traces.append(trace)
+
+    def ensure_sampler(self):
+        if self.sampler is None or not self.sampler.is_alive():
+            self.sampler = threading.Thread(target=self.run_sampler, name='request-profiler', daemon=True)
+            self.sampler.start()
+
+    def run_sampler(self):
+        while True:
+            with self.lock:
+                active = dict(self.active)
+            if not active:
+                # Exit when idle; the next profiled request restarts us
+                with self.lock:
+                    if not self.active:
+                        self.sampler = None
+                        return
+                continue
+
+            frames = sys._current_frames()
+            for thread_id, (trace, root) in active.items():
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and frame is not root:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    trace.samples[tuple(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def get_trace(self, trace_id):
+        for trace in self.traces:
+            if trace.id == trace_id:
+                return trace
+        return None
+
+    def list_traces(self):
+        return [trace.summary() for trace in reversed(self.traces)]
@@ -0,0 +1,55 @@
+import logging
+import sqlite3
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Immutable copy of the reference data every request reads: the rendered
+# vaccination schedule and active alerts per language, the parsed dose
+# table, the static fallback catalog and the intent routing table. It is
+# built once (in the pre-fork master when running multiple workers) and
+# replaced wholesale, never mutated, so forked workers share its pages
+# until the data actually changes.
+ReferenceSnapshot = namedtuple('ReferenceSnapshot', [
+    'built_at',
+    'vaccination_info',
+    'outbreak_info',
+    'valid_until',
+    'dose_table',
+    'fallback_catalog',
+    'intent_keywords'
+])
+
+
+class SnapshotWatcher:
+    """Rebuilds the reference snapshot when PRAGMA data_version of health_data.db changes"""
+
+    def __init__(self, on_change, db_path='health_data.db', interval=2.0):
+        self.on_change = on_change
+        self.db_path = db_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        # The connection is opened inside the thread so a watcher started
+        # after fork never shares a SQLite handle with the master
+        self.thread = threading.Thread(target=self.run, name='snapshot-watcher', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        conn = sqlite3.connect(self.db_path)
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        while not self.stop_event.wait(self.interval):
+            try:
+                current = conn.execute('PRAGMA data_version').fetchone()[0]
+                if current != version:
+                    version = current
+                    self.on_change()
+            except sqlite3.Error as e:
+                logger.error("Snapshot watcher error: %s", e)
+        conn.close()
+
+    def stop(self):
+        self.stop_event.set()
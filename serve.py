@@ -0,0 +1,122 @@
+"""Pre-fork multi-worker launcher for production.
+
+The master imports the app once: it migrates and seeds health_data.db,
+builds the reference snapshot and loads langdetect's language profiles.
+It then freezes the garbage collector so those objects are not touched
+again, opens the listening socket and forks the workers. Workers share
+the master's memory copy-on-write and only start their own background
+threads (analytics writer, alert watcher, snapshot watcher). The master
+runs the alert archival job and restarts workers that die.
+
+    python serve.py --workers 4 --port 5000
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+os.environ['HEALTH_MITRA_PREFORK'] = '1'
+
+from werkzeug.serving import make_server
+
+import app as health_app
+
+logger = logging.getLogger('serve')
+
+
+def warm_up():
+    """Load lazily initialised data in the master so workers inherit it"""
+    health_app.chatbot.detect_language("warm up the language profiles")
+    health_app.chatbot.detect_language("भाषा प्रोफ़ाइल लोड करें")
+
+
+def open_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock, host, port):
+    health_app.start_worker_services()
+    server = make_server(host, port, health_app.app, threaded=True, fd=sock.fileno())
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    finally:
+        health_app.analytics.close()
+        health_app.structured_logging.stop()
+
+
+def spawn_worker(sock, host, port):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(sock, host, port)
+        except SystemExit as e:
+            code = e.code or 0
+        except BaseException as e:
+            logger.exception("Worker %d crashed: %s", os.getpid(), e)
+            code = 1
+        os._exit(code)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Health Mitra with pre-forked workers")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    warm_up()
+    sock = open_socket(args.host, args.port)
+
+    # Move everything allocated so far out of the collector's reach, so
+    # collections in the workers do not write to (and copy) shared pages
+    gc.collect()
+    gc.freeze()
+
+    workers = {spawn_worker(sock, args.host, args.port) for _ in range(args.workers)}
+    logger.info("Master %d serving on %s:%d with %d workers", os.getpid(), args.host, args.port, len(workers))
+    health_app.start_alert_archiver()
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            logger.warning("Worker %d exited with status %d, restarting", pid, status)
+            time.sleep(1)
+            workers.add(spawn_worker(sock, args.host, args.port))
+
+    sock.close()
+
+
+if __name__ == '__main__':
+    main()
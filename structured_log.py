@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from collections import Counter
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line with the message, level and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and key != 'sampled':
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Adds fields from the current context (e.g. the request ID) to each record"""
+
+    def __init__(self, context):
+        super().__init__()
+        self.context = context
+
+    def filter(self, record):
+        for key, value in self.context().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a `rate` fraction of sampled info records; warnings and errors always pass"""
+
+    def __init__(self, rate, sampled_loggers=('werkzeug', 'httpx')):
+        super().__init__()
+        self.rate = rate
+        self.sampled_loggers = set(sampled_loggers)
+        self.sampled_out = 0
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or self.rate >= 1.0:
+            return True
+        if getattr(record, 'sampled', False) or record.name in self.sampled_loggers:
+            if random.random() >= self.rate:
+                self.sampled_out += 1
+                return False
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped and counted when full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = Counter()
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped[record.levelname.lower()] += 1
+
+
+class StructuredLogging:
+    """Root logging setup: JSON lines written by a background thread"""
+
+    def __init__(self, level='INFO', queue_size=10000, info_sample_rate=1.0, stream=None, context=None):
+        self.queue_size = queue_size
+        self.stream = stream or sys.stdout
+        self.output = logging.StreamHandler(self.stream)
+        self.output.setFormatter(JSONFormatter())
+        self.handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        self.sampler = SamplingFilter(info_sample_rate)
+        self.handler.addFilter(self.sampler)
+        if context is not None:
+            self.handler.addFilter(ContextFilter(context))
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(level)
+
+        self.listener = None
+        self.start()
+        # A forked child inherits neither the listener thread nor a usable queue
+        os.register_at_fork(after_in_child=self.restart_in_child)
+
+    def start(self):
+        self.listener = QueueListener(self.handler.queue, self.output, respect_handler_level=True)
+        self.listener.start()
+
+    def restart_in_child(self):
+        self.handler.queue = queue.Queue(maxsize=self.queue_size)
+        self.handler.dropped = Counter()
+        self.sampler.sampled_out = 0
+        self.start()
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.stream.flush()
+
+    def get_stats(self):
+        return {
+            'pending': self.handler.queue.qsize(),
+            'dropped': dict(self.handler.dropped),
+            'sampled_out': self.sampler.sampled_out
+        }
+
+
+def setup_logging(context=None):
+    """Configure structured logging from LOG_LEVEL, LOG_QUEUE_SIZE and LOG_INFO_SAMPLE_RATE"""
+    return StructuredLogging(
+        level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+        queue_size=int(os.environ.get('LOG_QUEUE_SIZE', '10000')),
+        info_sample_rate=float(os.environ.get('LOG_INFO_SAMPLE_RATE', '1.0')),
+        context=context
+    )
@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from stub_llm_server import serve
+
+STUB_PORT = 18791
+
+# app reads its backends at import time and creates its databases in the
+# working directory, so run it in a scratch directory
+os.chdir(tempfile.mkdtemp())
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+os.environ['LLM_BACKENDS'] = json.dumps([
+    {'name': 'stub', 'model': 'stub', 'base_url': f'http://127.0.0.1:{STUB_PORT}/v1', 'timeout': 5}
+])
+
+import app
+
+
+class ChatLLMTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = serve(STUB_PORT, name='stub', latency=0.0)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.client = app.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_vaccination_question_returns_llm_answer(self):
+        response = self.client.post('/chat', json={
+            'message': 'When is the BCG vaccine given?',
+            'preferred_language': 'en'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['response'].startswith('[stub] stub answer'))
+
+    def test_general_question_returns_llm_answer(self):
+        response = self.client.post('/chat', json={
+            'message': 'How do I stay healthy?',
+            'preferred_language': 'en'
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['response'].startswith('[stub] stub answer'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Completion budgets (max_tokens) per intent. Short factual lookups get a
+# small budget; guides like pregnancy care get more room.
+OUTPUT_BUDGETS = {
+    'vaccination': 300,
+    'outbreak': 300,
+    'covid': 350,
+    'fever': 350,
+    'diabetes': 450,
+    'pregnancy': 600,
+    'hypertension': 400,
+    'mental_health': 450,
+    'first_aid': 400,
+    'child_health': 450,
+    'common_symptoms': 350,
+    'nutrition': 400,
+    'elderly_care': 400,
+    'general': 350
+}
+
+# Per-channel caps applied on top of the intent budget
+CHANNEL_OUTPUT_LIMITS = {
+    'web': 600,
+    'sms': 120
+}
+
+DEFAULT_CHANNEL = 'web'
+
+# Prompts (system + user) above this are trimmed before the call
+PROMPT_TOKEN_LIMIT = 3000
+
+
+def get_output_budget(intent, channel=DEFAULT_CHANNEL):
+    """max_tokens for a completion, given the intent and delivery channel"""
+    budget = OUTPUT_BUDGETS.get(intent, OUTPUT_BUDGETS['general'])
+    return min(budget, CHANNEL_OUTPUT_LIMITS.get(channel, CHANNEL_OUTPUT_LIMITS[DEFAULT_CHANNEL]))
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when installed, else estimates them on the high side"""
+
+    def __init__(self, model='gpt-4o-mini'):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except (KeyError, ValueError):
+                self.encoding = tiktoken.get_encoding('o200k_base')
+
+    def count(self, text):
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        # ~4 characters per token for ASCII, ~2 for Devanagari and other scripts
+        ascii_chars = sum(1 for char in text if char.isascii())
+        return (ascii_chars + 3) // 4 + (len(text) - ascii_chars + 1) // 2
+
+    def count_messages(self, messages):
+        # Every chat message carries a few tokens of role/formatting overhead
+        return sum(self.count(message['content']) + 4 for message in messages) + 2
+
+    def trim(self, text, max_tokens):
+        """Cut text down to max_tokens, preferring to break at a line end"""
+        if max_tokens <= 0:
+            return ''
+        if self.count(text) <= max_tokens:
+            return text
+        if self.encoding is not None:
+            text = self.encoding.decode(self.encoding.encode(text)[:max_tokens])
+        else:
+            while self.count(text) > max_tokens:
+                text = text[:int(len(text) * 0.9)]
+
+        cut = text.rfind('\n')
+        return text[:cut] if cut > len(text) // 2 else text
@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Regional languages answered in their own language. Reference content is
+# authored in English and Hindi only, so these are served from translations.
+REGIONAL_LANGUAGES = {
+    'bn': 'Bengali',
+    'ta': 'Tamil',
+    'te': 'Telugu',
+    'mr': 'Marathi',
+    'gu': 'Gujarati',
+    'kn': 'Kannada',
+    'ml': 'Malayalam',
+    'pa': 'Punjabi',
+    'or': 'Odia',
+    'as': 'Assamese',
+    'ur': 'Urdu'
+}
+
+
+def source_hash(text):
+    """Short fingerprint of the source text a translation was made from"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+class TranslationMemory:
+    """Translations per (content ID, language) in SQLite with an LRU in front"""
+
+    def __init__(self, translate, db_path='translation_memory.db', cache_size=2048,
+                 max_pending=1000, miss_ttl=60.0, miss_cache_size=1024, start=True):
+        self.translate = translate
+        self.db_path = db_path
+        self.cache_size = cache_size
+        # Misses are cached apart from translations, so unique questions cannot
+        # evict the catalog, and re-checked in SQLite after miss_ttl seconds in
+        # case another worker stored the translation
+        self.miss_ttl = miss_ttl
+        self.miss_cache_size = miss_cache_size
+        self.cache = OrderedDict()
+        self.misses = OrderedDict()
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.pending = set()
+        # How often each content ID was asked for, for "store once frequent"
+        self.request_counts = OrderedDict()
+        self.stats = {'hits': 0, 'db_hits': 0, 'misses': 0, 'translated': 0, 'failed': 0, 'dropped': 0}
+        self.init_database()
+        self.translator = None
+        if start:
+            self.start()
+
+    def start(self):
+        """Start the background translator"""
+        self.translator = threading.Thread(target=self.run_translator, name='translator', daemon=True)
+        self.translator.start()
+
+    def connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def init_database(self):
+        conn = self.connect()
+        # WAL is a property of the database file, so setting it once is enough
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS translations (
+                content_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                source_hash TEXT NOT NULL,
+                text TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (content_id, language)
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def remember(self, key, value):
+        with self.lock:
+            self.misses.pop(key, None)
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def remember_miss(self, key, expected):
+        with self.lock:
+            # The translator may have stored it while SQLite was being read
+            entry = self.cache.get(key)
+            if entry is not None and entry[0] == expected:
+                return entry[1]
+            self.misses[key] = (expected, time.monotonic() + self.miss_ttl)
+            self.misses.move_to_end(key)
+            while len(self.misses) > self.miss_cache_size:
+                self.misses.popitem(last=False)
+            self.stats['misses'] += 1
+        return None
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def get(self, content_id, language, source):
+        """Translation of `source` for content_id, or None if not translated yet"""
+        key = (content_id, language)
+        expected = source_hash(source)
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None and entry[0] == expected:
+                self.cache.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            miss = self.misses.get(key)
+            if miss is not None and miss[0] == expected and time.monotonic() < miss[1]:
+                self.stats['misses'] += 1
+                return None
+
+        conn = self.connect()
+        row = conn.execute(
+            'SELECT source_hash, text FROM translations WHERE content_id = ? AND language = ?', key
+        ).fetchone()
+        conn.close()
+        if row is not None and row[0] == expected:
+            self.remember(key, (expected, row[1]))
+            self.count('db_hits')
+            return row[1]
+
+        return self.remember_miss(key, expected)
+
+    def put(self, content_id, language, source, text):
+        entry = (source_hash(source), text)
+        conn = self.connect()
+        with conn:
+            conn.execute('''
+                INSERT INTO translations (content_id, language, source_hash, text, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (content_id, language) DO UPDATE SET
+                    source_hash = excluded.source_hash,
+                    text = excluded.text,
+                    created_at = excluded.created_at
+            ''', (content_id, language) + entry + (datetime.now().isoformat(timespec='seconds'),))
+        conn.close()
+        self.remember((content_id, language), entry)
+
+    def request(self, content_id, language, source):
+        """Queue `source` for translation without blocking; returns False if not queued"""
+        key = (content_id, language, source_hash(source))
+        with self.lock:
+            if key in self.pending:
+                return False
+            self.pending.add(key)
+        try:
+            self.queue.put_nowait((content_id, language, source))
+            return True
+        except queue.Full:
+            with self.lock:
+                self.pending.discard(key)
+            self.count('dropped')
+            return False
+
+    def count_request(self, content_id):
+        """Count one more request for content_id and return the running total"""
+        with self.lock:
+            count = self.request_counts.pop(content_id, 0) + 1
+            self.request_counts[content_id] = count
+            while len(self.request_counts) > self.cache_size * 4:
+                self.request_counts.popitem(last=False)
+        return count
+
+    def run_translator(self):
+        while True:
+            content_id, language, source = self.queue.get()
+            try:
+                self.put(content_id, language, source, self.translate(source, language))
+                self.count('translated')
+            except Exception as e:
+                self.count('failed')
+                logger.warning("Translation failed: %s", e, extra={'content_id': content_id, 'language': language})
+            finally:
+                with self.lock:
+                    self.pending.discard((content_id, language, source_hash(source)))
+
+    def get_stats(self):
+        conn = self.connect()
+        rows = conn.execute('SELECT language, COUNT(*) FROM translations GROUP BY language').fetchall()
+        conn.close()
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update(cached=len(self.cache), cached_misses=len(self.misses), pending=len(self.pending),
+                         stored=dict(rows))
+        return stats